@@ -1,4 +1,5 @@
 import streamlit as st
+import io
 import os
 from spotify_backend import SpotifyBot
 
@@ -7,20 +8,75 @@ st.set_page_config(page_title="Spotify Studio Pro", page_icon="🎵", layout="wi
 
 st.title("🎵 Spotify Studio Pro")
 
+MAX_LOG_CHARS = 64 * 1024  # Only the most recent ~64 KB of log text is kept and sent to the browser
+
 # --- Initialize Bot and State ---
-if 'logs' not in st.session_state:
-    st.session_state.logs = []
+if 'log_text' not in st.session_state:
+    st.session_state.log_text = ""
 
 def log_to_ui(message):
-    st.session_state.logs.append(message)
+    # Messages can be batches of many lines, so the cap is on text, not on entries
+    text = st.session_state.log_text + message + "\n"
+    if len(text) > MAX_LOG_CHARS:
+        text = text[-MAX_LOG_CHARS:]
+        # Drop the partial line left at the cut
+        text = text[text.find("\n") + 1:]
+    st.session_state.log_text = text
 
-# Initialize bot only once
-if 'bot' not in st.session_state:
+def init_bot():
     try:
         st.session_state.bot = SpotifyBot(log_callback=log_to_ui)
     except Exception as e:
         st.error(f"Failed to initialize: {e}")
         st.session_state.bot = None
+    return st.session_state.bot
+
+def ensure_bot():
+    """Returns the session's bot, retrying a failed login first. Only called from button handlers."""
+    bot = st.session_state.bot
+    if not bot or not bot.sp:
+        bot = init_bot()
+    return bot
+
+# Initialize bot only once per session, so its log buffer and callback stay with that session.
+# A failed login is kept rather than retried on every rerun; starting a task tries again.
+if 'bot' not in st.session_state:
+    init_bot()
+bot = st.session_state.bot
+
+class NoSongsFound(ValueError):
+    def __init__(self, message, parse_log):
+        super().__init__(message)
+        self.parse_log = parse_log
+
+def run_logged(bot, parse, *args):
+    """Runs a bot parse with its log lines collected instead of sent, returning (result, log text)."""
+    lines = []
+    callback, bot.log_callback = bot.log_callback, lines.append
+    try:
+        result = parse(*args)
+    finally:
+        bot.log_callback = callback
+    return result, "\n".join(lines)
+
+# Parsed songs are memoized on their input, so re-clicking Generate with the same source is instant.
+# The parse log is cached with them and replayed by the caller, so a cache hit shows the same transcript.
+# Empty results raise instead of returning, which keeps failures out of the cache.
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_parse_csv(file_bytes, file_name, _bot):
+    upload = io.BytesIO(file_bytes)
+    upload.name = file_name
+    songs, parse_log = run_logged(_bot, _bot.parse_csv, upload)
+    if not songs:
+        raise NoSongsFound("No songs found in file.", parse_log)
+    return songs, parse_log
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def cached_parse_youtube(url, _bot):
+    songs, parse_log = run_logged(_bot, _bot.parse_youtube, url)
+    if not songs:
+        raise NoSongsFound("No songs found at URL.", parse_log)
+    return songs, parse_log
 
 # Display Logs (Sidebar or Bottom)
 with st.sidebar:
@@ -28,12 +84,11 @@ with st.sidebar:
     log_area = st.empty()
     # Function to render logs
     def render_logs():
-        log_text = "\n".join(st.session_state.logs)
-        log_area.text_area("Logs", log_text, height=400)
+        log_area.text_area("Logs", st.session_state.log_text, height=400)
     
     render_logs()
     if st.button("Clear Logs"):
-        st.session_state.logs = []
+        st.session_state.log_text = ""
         render_logs()
 
 # --- Main UI Tabs ---
@@ -49,10 +104,11 @@ with tab1:
     playlist_name = st.text_input("New Playlist Name", "My Awesome Playlist")
     
     if st.button("GENERATE PLAYLIST", type="primary"):
-        st.session_state.logs = [] # Clear previous logs
+        st.session_state.log_text = "" # Clear previous logs
+        bot = ensure_bot()
         render_logs()
         
-        if not st.session_state.bot or not st.session_state.bot.sp:
+        if not bot or not bot.sp:
             st.error("Spotify not authenticated. Check logs/credentials.")
         elif not playlist_name:
             st.warning("Please enter a playlist name.")
@@ -62,13 +118,18 @@ with tab1:
             with st.spinner("Processing... Check sidebar for details."):
                 # Determine Source
                 songs = []
-                if source_file:
-                    songs = st.session_state.bot.parse_csv(source_file)
-                elif yt_url:
-                    songs = st.session_state.bot.parse_youtube(yt_url)
+                try:
+                    if source_file:
+                        songs, parse_log = cached_parse_csv(source_file.getvalue(), source_file.name, bot)
+                    elif yt_url:
+                        songs, parse_log = cached_parse_youtube(yt_url, bot)
+                except NoSongsFound as e:
+                    parse_log = e.parse_log
+                if parse_log:
+                    log_to_ui(parse_log)
                 
                 if songs:
-                    st.session_state.bot.create_playlist_from_list(songs, playlist_name)
+                    bot.create_playlist_from_list(songs, playlist_name)
                     st.success("Task Complete!")
                 else:
                     st.error("No songs found to process.")
@@ -82,15 +143,16 @@ with tab2:
     playlist_link = st.text_input("Paste Spotify Playlist URL to Clean")
     
     if st.button("SCAN AND REMOVE DUPLICATES", type="primary"):
-        st.session_state.logs = []
+        st.session_state.log_text = ""
+        bot = ensure_bot()
         render_logs()
         
-        if not st.session_state.bot or not st.session_state.bot.sp:
+        if not bot or not bot.sp:
             st.error("Spotify not authenticated.")
         elif not playlist_link or "spotify" not in playlist_link:
             st.warning("Please enter a valid Spotify URL.")
         else:
             with st.spinner("Scanning playlist..."):
-                st.session_state.bot.deduplicate_playlist(playlist_link)
+                bot.deduplicate_playlist(playlist_link)
                 st.success("Task Complete!")
         render_logs()
\ No newline at end of file
@@ -2,18 +2,45 @@ import os
 import spotipy
 import random
 import csv
+import functools
+import importlib.util
+import io
+import json
 import re
-from difflib import SequenceMatcher
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from spotipy.cache_handler import CacheFileHandler
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Try importing yt_dlp
+# yt_dlp is slow to import, so only check that it's installed; parse_youtube imports it on first use
+YT_SUPPORT = importlib.util.find_spec("yt_dlp") is not None
+
+# Try importing rapidfuzz, falling back to difflib (C-accelerated by cdifflib when installed)
 try:
-    import yt_dlp
-    YT_SUPPORT = True
+    from rapidfuzz import process
+    from rapidfuzz.distance import Levenshtein
+    RAPIDFUZZ_SUPPORT = True
 except ImportError:
-    YT_SUPPORT = False
+    try:
+        from cdifflib import CSequenceMatcher as SequenceMatcher
+    except ImportError:
+        from difflib import SequenceMatcher
+    RAPIDFUZZ_SUPPORT = False
+
+# Try importing re2 (pip install google-re2), falling back to the stdlib engine
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +51,186 @@ CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI")
 SCOPE = "playlist-modify-private playlist-modify-public playlist-read-private ugc-image-upload"
 MATCH_THRESHOLD = 0.4
+SEARCH_CANDIDATES = 5  # Tracks fetched per search and scored against the query
+API_WORKERS = 10  # Max in-flight API requests
+API_RATE_LIMIT = 10  # Max API requests started per second across all threads; 429s start not far above this
+PAGE_SIZE = 100  # Max items per playlist page / add / remove request
+PLAYLIST_ITEM_FIELDS = "total,items(track(id,uri,name,artists(name)))"
+MAX_RETRIES = 5  # Attempts per API call on 429 / 5xx
+MAX_RETRY_AFTER = 60  # Longest Retry-After (seconds) we wait out before giving up on a call
+SEARCH_CACHE_PATH = ".search_cache.sqlite"
+SEARCH_CACHE_VERSION = 3  # Bump when the cached entry shape changes
+SEARCH_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached search result is looked up again
+CSV_SNIFF_SIZE = 4096  # Characters sampled to detect the file format
+CSV_DELIMITERS = ",;\t"  # Delimiters the sniffer may pick; anything else is read as one song per line
+LOG_FLUSH_INTERVAL = 0.5  # Seconds after which the next log() call delivers the buffer (there is no timer)
+LOG_FLUSH_LINES = 20  # Buffered lines that trigger a delivery regardless of time
+# Spotify field filters to drop from a query before comparing it to a result
+SEARCH_PREFIX_RE = re.compile(r'track:|artist:')
+# Runs of punctuation/underscores that match_key turns into word breaks
+NON_WORD_RE = re.compile(r'[\W_]+')
+# Track ids in pasted links, found anywhere in the line (e.g. after a title or inside <...>):
+# spotify:track:<id> or https://open.spotify.com/[intl-xx/]track/<id>
+SPOTIFY_TRACK_RE = re.compile(r'(?:spotify:track:|https?://open\.spotify\.com/(?:intl-[\w-]+/)?track/)([A-Za-z0-9]{22})')
+# Bracketed tags anywhere, plus trailing noise ("- Official Music Video", "– Lyrics", " HD") together with
+# its separator, removed in one pass. Trailing noise is only stripped at the end of the title (optionally
+# followed by more bracketed tags) so titles that merely start with or contain these words are kept.
+# Uses RE2's linear-time engine when google-re2 is installed; the inline (?i) keeps the pattern portable.
+YT_TITLE_NOISE_RE = regex_engine.compile(
+    r'(?i)'
+    r'(?:(?:\s*[-–—|]\s*|\s+)(?:official(?:\s+music|\s+lyric)?\s+video|lyrics|hd|hq))+'
+    r'(?:\s*(?:\([^)]*\)|\[[^\]]*\]))*\s*$'
+    r'|\([^)]*\)|\[[^\]]*\]'
+)
+
+# The on-disk search cache is opened once per process and shared by every bot (one per Streamlit session)
+_search_cache_lock = threading.Lock()
+_shared_search_cache = None
+
+def chunked(iterable, size):
+    """Yields successive lists of up to size items without slicing copies of the input."""
+    it = iter(iterable)
+    return iter(lambda: list(islice(it, size)), [])
+
+@functools.lru_cache(maxsize=4096)
+def track_label(artist, name):
+    """The lowercased 'artist title' string a search result is matched on."""
+    return f"{artist} {name}".lower()
+
+@functools.lru_cache(maxsize=4096)
+def match_key(text):
+    """
+    Lowercases, turns punctuation into spaces and sorts the words, so "adele hello" and
+    "Hello - Adele" compare equal and word order doesn't count against a match.
+    Cached like track_label, since the same labels come back for many queries.
+    """
+    return " ".join(sorted(NON_WORD_RE.sub(' ', text.lower()).split()))
+
+def best_match(query, choices, score_cutoff=MATCH_THRESHOLD):
+    """
+    Returns (choice, score, index) for the choice most similar to query, or None if none reaches
+    score_cutoff. Scores are 0-1; ties go to the earlier choice.
+    """
+    if RAPIDFUZZ_SUPPORT:
+        # One batched C call, scored by normalized Levenshtein similarity using rapidfuzz's bit-parallel
+        # implementation. Both sides go through match_key first, as in rapidfuzz's token_sort_ratio.
+        # score_cutoff lets rapidfuzz drop a choice as soon as a cheap bound of its score falls below
+        # the threshold.
+        return process.extractOne(query, choices, scorer=Levenshtein.normalized_similarity,
+                                  processor=match_key, score_cutoff=score_cutoff)
+    # Same preprocessing as above, so both paths compare the same strings. The metric still differs
+    # (Ratcliff-Obershelp instead of Levenshtein), so borderline scores can land differently.
+    best = None
+    sm = SequenceMatcher()
+    # SequenceMatcher caches its analysis of the second sequence, so the query goes there
+    sm.set_seq2(match_key(query))
+    for i, choice in enumerate(choices):
+        sm.set_seq1(match_key(choice))
+        # Cheap upper bounds first, so obvious misses skip the full ratio()
+        if sm.real_quick_ratio() < score_cutoff or sm.quick_ratio() < score_cutoff:
+            continue
+        ratio = sm.ratio()
+        if ratio >= score_cutoff and (best is None or ratio > best[1]):
+            best = (choice, ratio, i)
+    return best
+
+def flushes_log(method):
+    """Makes sure a bot operation delivers its buffered log lines before returning."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.flush_log()
+    return wrapper
+
+class MemoryFileCacheHandler(CacheFileHandler):
+    """
+    Token cache that reads the cache file once and then serves the token from memory.
+    spotipy asks for the token on every request; refreshed tokens are still written to disk.
+    """
+    def __init__(self, cache_path):
+        super().__init__(cache_path=cache_path)
+        self._token_info = None
+
+    def get_cached_token(self):
+        if self._token_info is None:
+            self._token_info = super().get_cached_token()
+        return self._token_info
+
+    def save_token_to_cache(self, token_info):
+        self._token_info = token_info
+        super().save_token_to_cache(token_info)
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per second, with bursts of up to `rate`."""
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._resume_at = 0  # monotonic time before which nobody may call, set by pause()
+        self._lock = threading.Lock()
+        self._pause_lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Holds every caller for `seconds` (e.g. a 429's Retry-After); overlapping pauses run to the latest end."""
+        with self._pause_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self):
+        """Blocks until a call is allowed."""
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+            while delay > 0:
+                time.sleep(delay)
+                # Restart from an empty bucket so the paused calls don't all go out in one burst
+                self._tokens = 0
+                self._last = time.monotonic()
+                delay = self._resume_at - self._last
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            # Sleep under the lock so waiting threads queue up in order
+            time.sleep((1 - self._tokens) / self.rate)
+            self._tokens = 0
+            self._last = time.monotonic()
+
+class SearchCache:
+    """
+    Key/value store for search results in a sqlite file, shared by every thread.
+    One connection serves all threads behind a lock; a database error counts as a cache miss.
+    """
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, value TEXT)")
+
+    def get(self, key):
+        """Returns the stored value, or None if missing or unreadable."""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM searches WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def put(self, key, value):
+        """Stores value (JSON-serializable); written to disk on the next sync()."""
+        try:
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO searches VALUES (?, ?)", (key, json.dumps(value)))
+        except sqlite3.Error:
+            pass
+
+    def sync(self):
+        try:
+            with self._lock:
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
 
 class SpotifyBot:
     def __init__(self, log_callback=None):
@@ -31,25 +238,57 @@ class SpotifyBot:
         :param log_callback: A function that accepts a string message (e.g., st.write or print)
         """
         self.log_callback = log_callback
+        self._log_buffer = deque()
+        self._last_flush = time.monotonic()
+        self._search_cache = self.open_search_cache()
+        self._search_memo = {}  # In-process layer over the db, which decodes on every read
+        self._rate_limiter = RateLimiter(API_RATE_LIMIT)
         self.sp = self.authenticate()
         if self.sp:
             try:
-                self.user_id = self.sp.current_user()['id']
+                self.user_id = self._call(self.sp.current_user)['id']
                 self.log("✅ Spotify authenticated.")
             except Exception as e:
                 self.log(f"❌ Auth Error: {e}")
                 self.sp = None
+        self.flush_log()
 
     def log(self, message):
-        """Sends message to the callback if it exists."""
+        """
+        Buffers message; buffered lines go out together once LOG_FLUSH_LINES are waiting or
+        LOG_FLUSH_INTERVAL has passed since the last delivery. Both are only checked here, so
+        callers flush_log() themselves before a long blocking phase.
+        """
+        self._log_buffer.append(message)
+        if (len(self._log_buffer) >= LOG_FLUSH_LINES
+                or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL):
+            self.flush_log()
+
+    def flush_log(self):
+        """Sends all buffered messages to the callback (or stdout) as a single string."""
+        if not self._log_buffer:
+            return
+        drained = "\n".join(self._log_buffer)
+        self._log_buffer.clear()
+        self._last_flush = time.monotonic()
         if self.log_callback:
-            self.log_callback(message)
+            self.log_callback(drained)
         else:
-            print(message)
+            print(drained)
 
     def authenticate(self):
         session = requests.Session()
         session.trust_env = False
+        # Transport-level retries for dropped keep-alive connections only, with enough pooled
+        # connections for every worker thread to reuse one. HTTP statuses (429, 5xx) are left
+        # to _call, so every retry goes back through the rate limiter and the Retry-After cap.
+        retry = Retry(
+            total=3,
+            status=0,
+            backoff_factor=0.5,
+            respect_retry_after_header=False,  # Otherwise a 429/503 with Retry-After is retried here
+        )
+        session.mount("https://", HTTPAdapter(pool_maxsize=API_WORKERS, max_retries=retry))
         
         try:
             # open_browser=False is crucial for Streamlit Cloud to prevent hanging
@@ -58,41 +297,78 @@ class SpotifyBot:
                 client_secret=CLIENT_SECRET,
                 redirect_uri=REDIRECT_URI,
                 scope=SCOPE,
-                cache_path=".spotify_cache",
+                cache_handler=MemoryFileCacheHandler(".spotify_cache"),
                 open_browser=False 
             ), requests_session=session)
         except Exception as e:
             self.log(f"FATAL AUTH ERROR: {str(e)}")
             return None 
 
+    def _call(self, fn, *args, retry_server_errors=True, **kwargs):
+        """
+        Calls a Spotify API method, retrying rate limits (429) and server errors (5xx).
+        Every attempt waits on the shared rate limiter, so pooled searches, page fetches and removals
+        together stay under API_RATE_LIMIT.
+
+        :param retry_server_errors: Pass False for calls that aren't safe to repeat (creating a playlist,
+            adding tracks), since a 5xx can arrive after Spotify already applied the change.
+        """
+        for attempt in range(MAX_RETRIES):
+            self._rate_limiter.wait()
+            try:
+                return fn(*args, **kwargs)
+            except SpotifyException as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                if e.http_status == 429:
+                    headers = getattr(e, 'headers', None) or {}
+                    try:
+                        retry_after = int(headers.get("Retry-After", 1))
+                    except (TypeError, ValueError):
+                        retry_after = 1
+                    # Spotify can ask for waits of hours; fail instead of hanging the run silently
+                    if retry_after > MAX_RETRY_AFTER:
+                        raise
+                    # The limit applies to the whole app, so every pooled worker waits, not just this one
+                    self._rate_limiter.pause(retry_after + random.random())
+                elif retry_server_errors and e.http_status and e.http_status >= 500:
+                    time.sleep(2 ** attempt)
+                else:
+                    raise
+
+    def open_search_cache(self):
+        """Returns the process-wide search cache, opening it on first use."""
+        global _shared_search_cache
+        with _search_cache_lock:
+            if _shared_search_cache is None:
+                try:
+                    _shared_search_cache = SearchCache(SEARCH_CACHE_PATH)
+                except sqlite3.Error as e:
+                    # e.g. the file is unreadable or the directory read-only; fall back to an in-memory cache
+                    self.log(f"⚠️ Search cache unavailable, using memory only: {e}")
+                    return SearchCache(":memory:")
+            return _shared_search_cache
+
+    @flushes_log
     def parse_csv(self, file_object):
         """
         Parses an uploaded file object (Streamlit UploadedFile) or local path.
         """
-        songs = []
         try:
             # Check if it's a Streamlit UploadedFile (has 'read' attribute) or string path
             if hasattr(file_object, 'read'):
-                # Reset pointer and decode
+                self.log(f"Loading songs from: {getattr(file_object, 'name', 'Uploaded File')}")
+                # Reset pointer and decode as we stream, rather than into one big string
                 file_object.seek(0)
-                content = file_object.read().decode('utf-8')
-                name = getattr(file_object, 'name', 'Uploaded File')
-            else:
-                with open(file_object, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                name = file_object
-
-            self.log(f"Loading songs from: {name}")
-
-            # Heuristic: if comma in first line, treat as CSV
-            if ',' in content and len(content.split('\n')[0].split(',')) > 1:
-                reader = csv.reader(content.splitlines())
-                for row in reader:
-                    if row:
-                        songs.append(row[0].strip())
+                f = io.TextIOWrapper(file_object, encoding='utf-8', newline='')
+                try:
+                    songs = self._read_songs(f)
+                finally:
+                    f.detach()  # Don't close the upload along with the wrapper
             else:
-                # Treat as line-by-line list
-                songs = [line.strip() for line in content.splitlines() if line.strip()]
+                self.log(f"Loading songs from: {file_object}")
+                with open(file_object, 'r', encoding='utf-8', newline='') as f:
+                    songs = self._read_songs(f)
 
             self.log(f"Successfully loaded {len(songs)} items.")
             return songs
@@ -100,6 +376,23 @@ class SpotifyBot:
             self.log(f"❌ Error parsing file: {e}")
             return []
 
+    @staticmethod
+    def _read_songs(f):
+        """Reads songs from an open text file in a single pass, sniffing the format from a leading sample."""
+        sample = f.read(CSV_SNIFF_SIZE)
+        f.seek(0)
+        # Sniff whole lines only: a row cut off at the sample boundary looks like an inconsistent row
+        end = sample.rfind('\n')
+        if end > 0:
+            sample = sample[:end]
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+        except csv.Error:
+            # No consistent delimiter: treat as line-by-line list
+            return [line.strip() for line in f if line.strip()]
+        return [row[0].strip() for row in csv.reader(f, dialect) if row]
+
+    @flushes_log
     def parse_youtube(self, url):
         songs = []
         if not YT_SUPPORT:
@@ -107,18 +400,26 @@ class SpotifyBot:
             return []
             
         self.log(f"Fetching titles from YouTube URL: {url}...")
+        self.flush_log()
         try:
+            # Metadata only: playlist entries come from the YouTube extractor's listing without per-video lookups
             ydl_opts = {
-                'format': 'bestaudio',
-                'dump_single_json': True,
-                'extract_flat': True,
-                'force_generic_extractor': True,
-                'logger': None, 
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': 'in_playlist',
+                'skip_download': True,
+                'ignoreerrors': True,  # A private/removed video shouldn't abort the whole playlist
             }
             
+            import yt_dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info_dict = ydl.extract_info(url, download=False)
 
+            # With ignoreerrors, a URL that fails outright comes back as None instead of raising
+            if not info_dict:
+                self.log("❌ Error: Could not fetch any data from the YouTube URL.")
+                return []
+
             entries = info_dict.get('entries', [info_dict] if 'title' in info_dict else [])
             
             if 'entries' in info_dict:
@@ -126,9 +427,7 @@ class SpotifyBot:
 
             for entry in entries:
                 if entry and 'title' in entry:
-                    title = entry['title']
-                    title = re.sub(r'\([^)]*\)|\[[^\]]*\]', '', title).strip()
-                    songs.append(title)
+                    songs.append(YT_TITLE_NOISE_RE.sub('', entry['title']).strip())
             
             if songs:
                 self.log(f"Successfully retrieved {len(songs)} song titles.")
@@ -141,6 +440,22 @@ class SpotifyBot:
             self.log(f"❌ Error fetching YouTube data: {e}")
             return []
 
+    def _fetch_playlist_items(self, playlist_id):
+        """Fetches all items of a playlist. The first page gives the total, the rest are fetched concurrently."""
+        def fetch_page(offset):
+            # spotipy asks for episodes too by default; only tracks can be deduplicated here
+            return self._call(self.sp.playlist_items, playlist_id, fields=PLAYLIST_ITEM_FIELDS,
+                              limit=PAGE_SIZE, offset=offset, additional_types=('track',))
+
+        first = fetch_page(0)
+        tracks = first['items']
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as pool:
+            # map() keeps pages in offset order, and so the item positions intact
+            for page in pool.map(fetch_page, range(PAGE_SIZE, first['total'], PAGE_SIZE)):
+                tracks.extend(page['items'])
+        return tracks
+
+    @flushes_log
     def deduplicate_playlist(self, playlist_url):
         try:
             if not self.sp:
@@ -154,33 +469,51 @@ class SpotifyBot:
                 playlist_id = playlist_url
 
             self.log(f"🔎 Scanning playlist ID: {playlist_id}...")
+            self.flush_log()
             
-            results = self.sp.playlist_items(playlist_id)
-            tracks = results['items']
-            while results['next']:
-                results = self.sp.next(results)
-                tracks.extend(results['items'])
-
-            seen_ids = set()
-            to_remove = []
-            
+            # Positions below are relative to this snapshot, however the removals get ordered
+            snapshot_id = self._call(self.sp.playlist, playlist_id, fields='snapshot_id')['snapshot_id']
+            tracks = self._fetch_playlist_items(playlist_id)
+            # Pages are fetched after the snapshot is read; an edit in between would shift the positions
+            if self._call(self.sp.playlist, playlist_id, fields='snapshot_id')['snapshot_id'] != snapshot_id:
+                self.log("⚠️ Playlist changed while scanning; nothing removed. Please run again.")
+                return
+
+            first_index = {}  # track id -> position of its first occurrence
+            repeats = {}  # track id -> positions of its later occurrences
+            first_setdefault = first_index.setdefault
+
             for i, item in enumerate(tracks):
-                if item.get('track') and item['track'].get('id'):
-                    tid = item['track']['id']
-                    if tid in seen_ids:
-                        to_remove.append({
-                            "uri": item['track']['uri'],
-                            "positions": [i] 
-                        })
-                        self.log(f"   -> Found duplicate: {item['track']['artists'][0]['name']} - {item['track']['name']}")
+                track = item.get('track')
+                tid = track and track.get('id')
+                if not tid:
+                    continue
+                if first_setdefault(tid, i) != i:
+                    if tid in repeats:
+                        repeats[tid].append(i)
                     else:
-                        seen_ids.add(tid)
+                        repeats[tid] = [i]
 
-            if to_remove:
-                self.log(f"🧹 Found {len(to_remove)} duplicates. Removing...")
-                for i in range(0, len(to_remove), 100):
-                    batch = to_remove[i:i+100]
-                    self.sp.playlist_remove_specific_occurrences_of_items(playlist_id, batch)
+            if repeats:
+                # One removal entry per duplicated track, carrying all of its repeat positions
+                to_remove = []
+                lines = []
+                for tid, positions in repeats.items():
+                    t = tracks[first_index[tid]]['track']
+                    to_remove.append({"uri": t['uri'], "positions": positions})
+                    count = f" (x{len(positions)})" if len(positions) > 1 else ""
+                    lines.append(f"   -> Found duplicate: {t['artists'][0]['name']} - {t['name']}{count}")
+                # One log call for the whole list instead of one per duplicate
+                self.log("\n".join(lines))
+                self.log(f"🧹 Found {sum(len(p) for p in repeats.values())} duplicates. Removing...")
+                self.flush_log()
+                with ThreadPoolExecutor(max_workers=API_WORKERS) as pool:
+                    # list() surfaces the first failed batch as an exception
+                    list(pool.map(
+                        lambda batch: self._call(self.sp.playlist_remove_specific_occurrences_of_items,
+                                                 playlist_id, batch, snapshot_id=snapshot_id),
+                        chunked(to_remove, PAGE_SIZE),
+                    ))
                 self.log("✅ Playlist cleaned!")
             else:
                 self.log("✨ No duplicates found.")
@@ -188,12 +521,90 @@ class SpotifyBot:
         except Exception as e:
             self.log(f"❌ Error during deduplication: {str(e)}")
 
-    def validate_match(self, query, track_obj):
-        found_str = f"{track_obj['artists'][0]['name']} {track_obj['name']}".lower()
-        clean_query = query.lower().replace("track:", "").replace("artist:", "")
-        ratio = SequenceMatcher(None, clean_query, found_str).ratio()
-        return (True, found_str) if ratio >= MATCH_THRESHOLD else (False, f"{found_str} ({ratio:.2f})")
+    def validate_match(self, clean_query, candidates):
+        """
+        Picks the search candidate that best matches the query.
+
+        :param clean_query: The search query, lowercased and stripped of field prefixes (track:, artist:)
+        :param candidates: Track dicts from the search, in Spotify's ranking order
+        :return: (is_valid, best track, description of the match)
+        """
+        # Popular tracks come back for many queries, so labels are built once per track
+        found_strs = [track_label(t['artists'][0]['name'], t['name']) for t in candidates]
+        # Exact or contained matches are common with clean metadata and need no fuzzy scoring
+        if clean_query:
+            for track, found_str in zip(candidates, found_strs):
+                if clean_query in found_str or found_str in clean_query:
+                    return (True, track, found_str)
+        match = best_match(clean_query, found_strs)
+        if match is None:
+            # Nothing reached the threshold: rescore without a cutoff so the log shows the closest score
+            found_str, score, best = best_match(clean_query, found_strs, score_cutoff=0)
+            return (False, candidates[best], f"{found_str} ({score:.2f})")
+        found_str, _, best = match
+        return (True, candidates[best], found_str)
+
+    @staticmethod
+    def _normalize(query):
+        """Lowercases and collapses whitespace so trivially different queries share a cache slot."""
+        return " ".join(query.lower().split())
+
+    def _cache_key(self, query):
+        return f"v{SEARCH_CACHE_VERSION}:{self._normalize(query)}"
+
+    def _cache_get(self, key):
+        """Returns (True, cached candidates) on a hit, or (False, None) if not cached or expired."""
+        entry = self._search_memo.get(key)
+        if entry is None:
+            entry = self._search_cache.get(key)
+            if entry is not None:
+                self._search_memo[key] = entry
+        if entry is not None and time.time() - entry[0] < SEARCH_CACHE_TTL:
+            return True, entry[1]
+        return False, None
+
+    def _cache_put(self, key, candidates):
+        entry = (time.time(), candidates)
+        self._search_memo[key] = entry
+        self._search_cache.put(key, entry)
 
+    def _search_one(self, query):
+        """Returns (query, candidate tracks, error or None) for a single search."""
+        try:
+            res = self._call(self.sp.search, q=query, limit=SEARCH_CANDIDATES, type='track')
+            # Keep only what validate_match and playlist creation need
+            return query, [{
+                'id': track['id'],
+                'name': track['name'],
+                'artists': [{'name': a['name']} for a in track['artists']],
+            } for track in res['tracks']['items']], None
+        except Exception as e:
+            return query, [], e
+
+    def _search_all(self, queries):
+        """Resolves queries from the search cache and searches the rest on a bounded thread pool.
+        Results are returned in input order."""
+        results = {}
+        pending = []
+        for query in queries:
+            hit, candidates = self._cache_get(self._cache_key(query))
+            if hit:
+                results[query] = (query, candidates, None)
+            else:
+                pending.append(query)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=API_WORKERS) as pool:
+                for query, candidates, error in pool.map(self._search_one, pending):
+                    if not error:
+                        # Empty results are cached too, so known misses aren't searched again
+                        self._cache_put(self._cache_key(query), candidates)
+                    results[query] = (query, candidates, error)
+            self._search_cache.sync()
+
+        return [results[query] for query in queries]
+
+    @flushes_log
     def create_playlist_from_list(self, song_list, playlist_name):
         if not self.sp:
             self.log("❌ Cannot create playlist: Spotify not authenticated.")
@@ -201,28 +612,51 @@ class SpotifyBot:
 
         valid_ids = []
         missing = []
-        
+
+        # Pasted Spotify track links/URIs already name the track and skip the search entirely
+        direct_ids = {}
+        # Drop repeated entries so each song is searched once, keeping order. Links are compared by
+        # track id, since share links to the same track differ in their ?si= parameter; other
+        # entries by their text, ignoring case/whitespace.
+        unique_songs = []
+        seen = set()
+        for query in song_list:
+            m = SPOTIFY_TRACK_RE.search(query)
+            key = f"spotify:track:{m.group(1)}" if m else self._normalize(query)
+            if key not in seen:
+                seen.add(key)
+                unique_songs.append(query)
+                if m:
+                    direct_ids[query] = m.group(1)
+        if len(unique_songs) < len(song_list):
+            self.log(f"   -> Skipped {len(song_list) - len(unique_songs)} duplicate entries.")
+        song_list = unique_songs
+
         self.log(f"🔎 Processing {len(song_list)} songs...")
-        
-        # Streamlit progress bar handling could go here, but logging is safer
+        self.flush_log()
+
+        # Searches run concurrently; results come back in input order so logging stays on this thread
+        searched = iter(self._search_all([q for q in song_list if q not in direct_ids]))
         for query in song_list:
-            try:
-                # Simple sleep or check to avoid rate limits could be added here
-                res = self.sp.search(q=query, limit=1, type='track')
-                if res['tracks']['items']:
-                    track = res['tracks']['items'][0]
-                    is_valid, found_name = self.validate_match(query, track)
-                    if is_valid:
-                        valid_ids.append(track['id'])
-                        self.log(f"   -> Found: {found_name}")
-                    else:
-                        self.log(f"   -> Weak Match (Skipped): {query} vs {found_name}")
-                        missing.append(query)
+            if query in direct_ids:
+                valid_ids.append(direct_ids[query])
+                self.log(f"   -> Linked: {query}")
+                continue
+            _, candidates, error = next(searched)
+            if error:
+                self.log(f"Error searching {query}: {error}")
+                missing.append(query)
+            elif candidates:
+                clean_query = SEARCH_PREFIX_RE.sub('', query.lower())
+                is_valid, track, found_name = self.validate_match(clean_query, candidates)
+                if is_valid:
+                    valid_ids.append(track['id'])
+                    self.log(f"   -> Found: {found_name}")
                 else:
-                    self.log(f"   -> Not found: {query}")
+                    self.log(f"   -> Weak Match (Skipped): {query} vs {found_name}")
                     missing.append(query)
-            except Exception as e:
-                self.log(f"Error searching {query}: {e}")
+            else:
+                self.log(f"   -> Not found: {query}")
                 missing.append(query)
 
         if not valid_ids:
@@ -234,13 +668,15 @@ class SpotifyBot:
 
         try:
             desc = f"Generated by Spotify Studio Pro 🐍 | {len(valid_ids)} Tracks"
-            pl = self.sp.user_playlist_create(self.user_id, playlist_name, public=False, description=desc)
+            pl = self._call(self.sp.user_playlist_create, self.user_id, playlist_name, public=False,
+                            description=desc, retry_server_errors=False)
             
-            uris = [f"spotify:track:{tid}" for tid in valid_ids]
-            for i in range(0, len(uris), 100):
-                self.sp.playlist_add_items(pl['id'], uris[i:i+100])
+            # Sequential on purpose: concurrent appends would land in arbitrary order.
+            # spotipy turns bare track ids into spotify:track: URIs itself.
+            for batch in chunked(valid_ids, PAGE_SIZE):
+                self._call(self.sp.playlist_add_items, pl['id'], batch, retry_server_errors=False)
             
-            self.log(f"🚀 Success! Created '{playlist_name}' with {len(uris)} songs.")
+            self.log(f"🚀 Success! Created '{playlist_name}' with {len(valid_ids)} songs.")
             self.log(f"🔗 Link: {pl['external_urls']['spotify']}")
         except Exception as e:
             self.log(f"❌ Error creating playlist: {e}")
@@ -254,9 +690,10 @@ class SpotifyBot:
         if len(track_ids) >= target_size: return track_ids
         self.log(f"✨ Extending playlist from {len(track_ids)} to {target_size} songs...")
         needed = target_size - len(track_ids)
-        seeds = random.sample(track_ids, min(5, len(track_ids)))
+        # Spotify takes at most 5 seeds; short lists are used as-is
+        seeds = track_ids if len(track_ids) <= 5 else random.sample(track_ids, 5)
         try:
-            recs = self.sp.recommendations(seed_tracks=seeds, limit=needed)
+            recs = self._call(self.sp.recommendations, seed_tracks=seeds, limit=needed)
             new_ids = [t['id'] for t in recs['tracks']]
             self.log(f"   -> Added {len(new_ids)} recommended tracks.")
             return track_ids + new_ids